@@ -2,17 +2,21 @@
 import argparse
 import csv
 import hashlib
+import io
 import logging
 import os
 import re
 import sys
 import tempfile
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, List, Optional, Tuple
+from typing import Iterable, List, Optional, TextIO, Tuple
 from urllib.parse import urlparse, urlunparse
 
+import orjson
 import requests
 import yaml
 from bs4 import BeautifulSoup
@@ -66,6 +70,21 @@ MIN_MEANINGFUL_PARAGRAPHS = 3
 MIN_META_HF_CHARS = 200
 MIN_SUMMARY_WORDS = 20
 REQUEST_TIMEOUT = (10, 60)
+LEGACY_ID_LENGTH = 64
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+# The DOC API allows one request every 5 seconds; bursts come back as 429s.
+GDELT_MIN_REQUEST_INTERVAL_S = 5.0
+USER_AGENT = "bny-ai-risk-management/1.0"
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/json",
+}
+ARTICLE_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml",
+}
+CSV_BUFFER_SIZE = 1 << 20
 LOGGER = logging.getLogger(__name__)
 
 
@@ -179,20 +198,59 @@ def fetch_feed(
         "sort": "HybridRel",
         "timespan": timespan,
     }
-    response = session.get(
-        BASE_URL,
-        params=params,
-        timeout=REQUEST_TIMEOUT,
-        headers={
-            "User-Agent": "bny-ai-risk-management/1.0",
-            "Accept": "application/json",
-        },
-    )
+    response = session.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
-    data = response.json()
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        # orjson rejects invalid UTF-8 that response.json() decodes leniently. Plain-text
+        # error bodies (sent with 200) still raise requests' JSONDecodeError from here, so
+        # --fail_on_feed_error applies.
+        data = response.json()
     return data.get("articles", [])
 
 
+def build_session() -> requests.Session:
+    session = requests.Session()
+    # Share pooled TCP/TLS connections across feeds instead of re-handshaking per call.
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+class RequestPacer:
+    """Spaces out calls so consecutive requests start at least `interval_s` apart."""
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self._next_allowed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_allowed = time.monotonic() + self.interval_s
+
+
+def fetch_feed_paced(
+    pacer: RequestPacer,
+    session: requests.Session,
+    feed: FeedConfig,
+    max_records: int,
+    timespan: str,
+) -> List[dict]:
+    pacer.wait()
+    return fetch_feed(session, feed, max_records=max_records, timespan=timespan)
+
+
 def normalize_link(link: str) -> str:
     parsed = urlparse(link.strip())
     normalized = parsed._replace(query="", fragment="")
@@ -200,7 +258,8 @@ def normalize_link(link: str) -> str:
 
 
 def compute_id(normalized_link: str) -> str:
-    return hashlib.sha256(normalized_link.encode("utf-8")).hexdigest()
+    # 128-bit BLAKE2b is ample for a dedupe key and faster/smaller than SHA-256.
+    return hashlib.blake2b(normalized_link.encode("utf-8"), digest_size=16).hexdigest()
 
 
 def infer_ticker(query: str) -> str:
@@ -273,13 +332,29 @@ def load_existing_ids(out_csv: str) -> set:
         header = next(reader, [])
         if header != SCHEMA:
             raise ValueError("Existing CSV schema mismatch; run validate.py to inspect.")
-        return {row[0] for row in reader if row}
+        link_index = SCHEMA.index("link")
+        ids = set()
+        for row in reader:
+            if not row:
+                continue
+            ids.add(row[0])
+            # Rows written before the switch to BLAKE2b ids carry 64-char SHA-256 ids; also
+            # register the current id for their link so they keep deduplicating.
+            if len(row[0]) == LEGACY_ID_LENGTH and len(row) > link_index and row[link_index]:
+                ids.add(compute_id(row[link_index]))
+        return ids
 
 
-def append_rows(out_csv: str, rows: Iterable[List[str]]) -> None:
-    with open(out_csv, "a", newline="", encoding="utf-8") as handle:
-        writer = csv.writer(handle)
-        writer.writerows(rows)
+def open_csv_for_append(out_csv: str) -> TextIO:
+    # One large binary buffer for the whole run: each feed's rows are encoded into it and
+    # reach the file in a single write when append_rows flushes.
+    raw = open(out_csv, "ab", buffering=CSV_BUFFER_SIZE)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=False)
+
+
+def append_rows(handle: TextIO, rows: Iterable[List[str]]) -> None:
+    csv.writer(handle).writerows(rows)
+    handle.flush()
 
 
 def build_item(article: dict) -> NewsItem:
@@ -385,14 +460,7 @@ def extract_candidate_text(html: str) -> Tuple[str, str]:
 
 def fetch_article_text(url: str, timeout: int) -> Tuple[str, str]:
     try:
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={
-                "User-Agent": "bny-ai-risk-management/1.0",
-                "Accept": "text/html,application/xhtml+xml",
-            },
-        )
+        response = requests.get(url, timeout=timeout, headers=ARTICLE_HEADERS)
         response.raise_for_status()
     except requests.RequestException as exc:
         logging.debug("Failed to fetch article %s: %s", url, exc)
@@ -603,22 +671,15 @@ def backfill_missing_summaries(out_csv: str, summary_config: SummaryConfig) -> N
 
 def ingest_feed(
     feed: FeedConfig,
-    out_csv: str,
-    max_records: int,
-    timespan: str,
+    articles_future: "Future[List[dict]]",
+    csv_handle: TextIO,
     fetched_at: str,
     seen_ids: set,
     summary_config: SummaryConfig,
-    session: requests.Session,
     fail_on_feed_error: bool,
 ) -> int:
     try:
-        articles = fetch_feed(
-            session,
-            feed,
-            max_records=max_records,
-            timespan=timespan,
-        )
+        articles = articles_future.result()
     except (RetryError, requests.RequestException) as exc:
         if fail_on_feed_error:
             raise
@@ -635,6 +696,8 @@ def ingest_feed(
     new_rows: List[List[str]] = []
     new_count = 0
     skipped = 0
+    # Constant for every row of this feed; resolve once instead of re-scanning the query per row.
+    ticker = infer_ticker(feed.query)
     summary_budget = summary_config.max_hf_new_per_run
     hf_budget = summary_config.max_hf_new_per_run
     summary_counts = {
@@ -691,7 +754,7 @@ def ingest_feed(
         new_rows.append(
             [
                 feed_id,
-                infer_ticker(feed.query),
+                ticker,
                 item.title,
                 normalized_link,
                 item.published,
@@ -704,7 +767,7 @@ def ingest_feed(
         new_count += 1
 
     if new_rows:
-        append_rows(out_csv, new_rows)
+        append_rows(csv_handle, new_rows)
 
     logging.info("Feed %s complete: %d new, %d skipped", feed.name, new_count, skipped)
     logging.info(
@@ -818,24 +881,43 @@ def main() -> int:
 
     fetched_at = datetime.now(timezone.utc).isoformat()
     total_new = 0
-    session = requests.Session()
-
-    for feed in feeds:
-        try:
-            total_new += ingest_feed(
+    session = build_session()
+
+    # Unlike Yahoo Finance, GDELT rate-limits to one request every 5 seconds, so feeds are
+    # fetched on a single paced worker. It still prefetches the next feed while the main
+    # thread summarizes and writes the current one, in config order.
+    pacer = RequestPacer(GDELT_MIN_REQUEST_INTERVAL_S)
+    with (
+        session,
+        ThreadPoolExecutor(max_workers=1) as executor,
+        open_csv_for_append(args.out_csv) as csv_handle,
+    ):
+        futures = [
+            executor.submit(
+                fetch_feed_paced,
+                pacer,
+                session,
                 feed,
-                out_csv=args.out_csv,
                 max_records=args.max_records,
                 timespan=args.timespan,
-                fetched_at=fetched_at,
-                seen_ids=seen_ids,
-                summary_config=summary_config,
-                session=session,
-                fail_on_feed_error=args.fail_on_feed_error,
             )
-        except (RetryError, requests.RequestException) as exc:
-            logging.error("Failed to fetch feed %s: %s", feed.name, exc)
-            return 1
+            for feed in feeds
+        ]
+        for feed, articles_future in zip(feeds, futures):
+            try:
+                total_new += ingest_feed(
+                    feed,
+                    articles_future,
+                    csv_handle=csv_handle,
+                    fetched_at=fetched_at,
+                    seen_ids=seen_ids,
+                    summary_config=summary_config,
+                    fail_on_feed_error=args.fail_on_feed_error,
+                )
+            except (RetryError, requests.RequestException) as exc:
+                logging.error("Failed to fetch feed %s: %s", feed.name, exc)
+                executor.shutdown(wait=False, cancel_futures=True)
+                return 1
 
     backfill_missing_summaries(args.out_csv, summary_config)
 
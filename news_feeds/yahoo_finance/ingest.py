@@ -2,23 +2,53 @@
 import argparse
 import csv
 import hashlib
+import io
 import logging
 import os
+import re
 import sqlite3
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, TextIO, Tuple
 from urllib.parse import urljoin, urlparse, urlunparse
 
 import requests
 import yaml
-from bs4 import BeautifulSoup
-from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+from lxml.etree import XMLSyntaxError
+from lxml.html import HtmlElement, HTMLParser
+from tenacity import (
+    RetryError,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 BASE_URL = "https://finance.yahoo.com/quote/{ticker}/news/"
 FALLBACK_URL = "https://finance.yahoo.com/topic/stock-market-news/"
 
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+MAX_FEED_WORKERS = 16
+# Article pages mostly live on finance.yahoo.com; keep per-host concurrency low to avoid 429s.
+MAX_ENRICH_WORKERS = 3
+QUOTED_PHRASE_RE = re.compile(r'"([^"]*)"')
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+CSV_BUFFER_SIZE = 1 << 20
+STREAM_CHUNK_SIZE = 1 << 16
+# Bumped when seen_feed_ids needs a data migration (1: BLAKE2b ids).
+SEEN_IDS_VERSION = 1
+
 SCHEMA = [
     "id",
     "title",
@@ -87,41 +117,63 @@ def should_retry(exception: Exception) -> bool:
     return False
 
 
+def build_html_parser(response: requests.Response) -> HTMLParser:
+    # Only trust an explicit charset: without one requests reports ISO-8859-1 for text/*,
+    # which would override the page's own <meta charset>. Parsers are per call as they
+    # are not thread-safe.
+    if "charset=" in response.headers.get("content-type", "").lower():
+        try:
+            return HTMLParser(encoding=response.encoding)
+        except LookupError:
+            logging.debug("Unknown charset %s; letting lxml detect it", response.encoding)
+    return HTMLParser()
+
+
 @retry(
     wait=wait_exponential(multiplier=1, min=2, max=20),
     stop=stop_after_attempt(3),
     retry=retry_if_exception(should_retry),
 )
-def fetch_url(url: str, session: requests.Session) -> Optional[str]:
+def fetch_document(url: str, session: requests.Session) -> Optional[HtmlElement]:
     logging.debug("Fetching URL: %s", url)
-    response = session.get(
-        url,
-        headers={
-            "User-Agent": (
-                "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-                "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-        },
-        timeout=20,
-    )
-
-    # Hard handling so 404/4xx won't become HTTPError -> tenacity RetryError
-    if response.status_code == 404:
-        logging.warning("Received 404 for %s", url)
-        return None
-
-    # Retriable HTTP statuses
-    if response.status_code == 429 or response.status_code >= 500:
-        response.raise_for_status()  # triggers retry via tenacity predicate
+    with session.get(url, timeout=20, stream=True) as response:
+        # Hard handling so 404/4xx won't become HTTPError -> tenacity RetryError
+        if response.status_code == 404:
+            logging.warning("Received 404 for %s", url)
+            return None
+
+        # Retriable HTTP statuses
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()  # triggers retry via tenacity predicate
+
+        # Other 4xx are non-retriable; return None so caller can fallback/skip
+        if 400 <= response.status_code < 500:
+            logging.error("Received %s for %s", response.status_code, url)
+            return None
+
+        # Feed the parser as chunks arrive so parsing overlaps with the download.
+        parser = build_html_parser(response)
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+        try:
+            return parser.close()
+        except XMLSyntaxError:
+            logging.warning("Empty document for %s", url)
+            return None
 
-    # Other 4xx are non-retriable; return None so caller can fallback/skip
-    if 400 <= response.status_code < 500:
-        logging.error("Received %s for %s", response.status_code, url)
-        return None
 
-    return response.text
+def build_session() -> requests.Session:
+    session = requests.Session()
+    # Article pages for enrich_summary repeatedly hit the same hosts; keep those connections warm.
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
 
 
 def normalize_link(link: str, base_url: str) -> str:
@@ -132,52 +184,57 @@ def normalize_link(link: str, base_url: str) -> str:
 
 
 def compute_id(normalized_link: str) -> str:
-    return hashlib.sha256(normalized_link.encode("utf-8")).hexdigest()
+    # 128-bit BLAKE2b is ample for a dedupe key and faster/smaller than SHA-256.
+    return hashlib.blake2b(normalized_link.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def node_text(node: HtmlElement) -> str:
+    # Same result as BeautifulSoup's get_text(strip=True).
+    return "".join(text.strip() for text in node.itertext())
 
 
-def extract_time(container: Optional[BeautifulSoup]) -> str:
-    if not container:
+def extract_time(container: Optional[HtmlElement]) -> str:
+    if container is None:
         return ""
-    time_tag = container.find("time")
-    if time_tag:
-        if time_tag.has_attr("datetime"):
-            return time_tag["datetime"].strip()
-        return time_tag.get_text(strip=True)
+    time_tag = container.find(".//time")
+    if time_tag is not None:
+        if time_tag.get("datetime") is not None:
+            return time_tag.get("datetime").strip()
+        return node_text(time_tag)
     return ""
 
 
-def extract_source(container: Optional[BeautifulSoup]) -> str:
-    if not container:
+def extract_source(container: Optional[HtmlElement]) -> str:
+    if container is None:
         return ""
-    source_tag = container.find(["span", "div"], attrs={"class": lambda c: c and "publisher" in c})
-    if source_tag:
-        return source_tag.get_text(strip=True)
-    label = container.find("span", attrs={"data-test": "source"})
-    if label:
-        return label.get_text(strip=True)
+    source_tags = container.xpath(
+        './/*[self::span or self::div][contains(@class, "publisher")]'
+    )
+    if source_tags:
+        return node_text(source_tags[0])
+    label = container.find('.//span[@data-test="source"]')
+    if label is not None:
+        return node_text(label)
     return ""
 
 
-def extract_summary(container: Optional[BeautifulSoup]) -> str:
-    if not container:
+def extract_summary(container: Optional[HtmlElement]) -> str:
+    if container is None:
         return ""
-    snippet = container.find("p")
-    if snippet:
-        return snippet.get_text(strip=True)
+    snippet = container.find(".//p")
+    if snippet is not None:
+        return node_text(snippet)
     return ""
 
 
-def parse_news_items(html: str, base_url: str) -> List[NewsItem]:
-    soup = BeautifulSoup(html, "html.parser")
-    anchors = soup.find_all("a", href=True)
+def parse_news_items(tree: HtmlElement, base_url: str) -> List[NewsItem]:
     items: List[NewsItem] = []
     seen_links = set()
 
-    for anchor in anchors:
-        href = anchor.get("href", "")
-        if "/news/" not in href:
-            continue
-        title = anchor.get_text(strip=True)
+    # Filter to news links inside the XPath engine rather than visiting every anchor in Python.
+    for anchor in tree.xpath('.//a[contains(@href, "/news/")]'):
+        href = anchor.get("href")
+        title = node_text(anchor)
         if not title:
             continue
 
@@ -185,7 +242,7 @@ def parse_news_items(html: str, base_url: str) -> List[NewsItem]:
         if normalized in seen_links:
             continue
 
-        container = anchor.find_parent(["article", "li", "div"])
+        container = next(anchor.iterancestors("article", "li", "div"), None)
         summary = extract_summary(container)
         published = extract_time(container)
         source = extract_source(container) or "Yahoo Finance"
@@ -210,27 +267,18 @@ def extract_query_terms(query: str) -> List[str]:
       ("BNY Mellon" OR "Bank of New York Mellon" OR BK) -sports -gossip
     -> ["bny mellon", "bank of new york mellon"]
     """
-    phrases: List[str] = []
-    start = 0
-    while True:
-        start_quote = query.find('"', start)
-        if start_quote == -1:
-            break
-        end_quote = query.find('"', start_quote + 1)
-        if end_quote == -1:
-            break
-        phrase = query[start_quote + 1 : end_quote].strip()
-        if phrase:
-            phrases.append(phrase.lower())
-        start = end_quote + 1
-    return phrases
-
-
-def matches_query(item: NewsItem, feed: FeedConfig) -> bool:
+    return [
+        phrase.strip().lower()
+        for phrase in QUOTED_PHRASE_RE.findall(query)
+        if phrase.strip()
+    ]
+
+
+def matches_query(item: NewsItem, ticker_lower: str, phrases: Tuple[str, ...]) -> bool:
     text = f"{item.title} {item.summary}".lower()
-    if feed.ticker.lower() in text:
+    if ticker_lower in text:
         return True
-    for phrase in extract_query_terms(feed.query):
+    for phrase in phrases:
         if phrase in text:
             return True
     return False
@@ -240,38 +288,83 @@ def enrich_summary(item: NewsItem, session: requests.Session) -> NewsItem:
     if item.summary:
         return item
     try:
-        html = fetch_url(item.link, session)
-    except requests.RequestException as exc:
+        tree = fetch_document(item.link, session)
+    except (RetryError, requests.RequestException) as exc:
+        # Summary enrichment is best-effort; a rate-limited article must not fail the feed.
         logging.warning("Failed to fetch article for summary: %s", exc)
         return item
 
-    if not html:
+    if tree is None:
         return item
-
-    soup = BeautifulSoup(html, "html.parser")
-    meta = soup.find("meta", attrs={"name": "description"})
-    if not meta:
-        meta = soup.find("meta", attrs={"property": "og:description"})
-    if meta and meta.get("content"):
-        item.summary = meta["content"].strip()
+    meta = tree.find('.//meta[@name="description"]')
+    if meta is None:
+        meta = tree.find('.//meta[@property="og:description"]')
+    if meta is not None and meta.get("content"):
+        item.summary = meta.get("content").strip()
     return item
 
 
-def ensure_db(db_path: str) -> None:
+def open_db(db_path: str) -> sqlite3.Connection:
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
-        conn.execute(
-            "CREATE TABLE IF NOT EXISTS seen_feed_ids ("
-            "id TEXT PRIMARY KEY, first_seen_at TEXT NOT NULL)"
-        )
-        conn.commit()
+    # Autocommit mode: transactions are opened explicitly around batched writes.
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    # WAL + NORMAL sync: commits append to the log instead of fsyncing the main DB file.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    return conn
+
+
+def ensure_db(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS seen_feed_ids ("
+        "id TEXT PRIMARY KEY, first_seen_at TEXT NOT NULL)"
+    )
 
 
-def insert_seen_id(conn: sqlite3.Connection, feed_id: str, first_seen_at: str) -> None:
-    conn.execute(
+def migrate_seen_ids(conn: sqlite3.Connection, out_csv: str) -> None:
+    """
+    Register current-format ids for every link already in the CSV so articles
+    stored under older SHA-256 ids are still recognized as seen.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SEEN_IDS_VERSION:
+        return
+    rows: List[Tuple[str, str]] = []
+    if os.path.exists(out_csv):
+        link_index = SCHEMA.index("link")
+        fetched_index = SCHEMA.index("fetched_at")
+        with open(out_csv, "r", encoding="utf-8", newline="") as handle:
+            reader = csv.reader(handle)
+            next(reader, None)
+            for row in reader:
+                if len(row) == len(SCHEMA) and row[link_index]:
+                    rows.append((compute_id(row[link_index]), row[fetched_index]))
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT OR IGNORE INTO seen_feed_ids (id, first_seen_at) VALUES (?, ?)",
+        rows,
+    )
+    conn.execute(f"PRAGMA user_version = {SEEN_IDS_VERSION}")
+    conn.commit()
+    logging.info("Migrated seen ids from %s; ids registered: %d", out_csv, len(rows))
+
+
+def load_seen_ids(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT id FROM seen_feed_ids")}
+
+
+def insert_seen_ids(conn: sqlite3.Connection, rows: List[Tuple[str, str]]) -> None:
+    if not rows:
+        return
+    conn.execute("BEGIN")
+    conn.executemany(
         "INSERT OR IGNORE INTO seen_feed_ids (id, first_seen_at) VALUES (?, ?)",
-        (feed_id, first_seen_at),
+        rows,
     )
+    conn.commit()
 
 
 def ensure_csv(out_csv: str) -> None:
@@ -282,41 +375,63 @@ def ensure_csv(out_csv: str) -> None:
             writer.writerow(SCHEMA)
 
 
-def append_rows(out_csv: str, rows: Iterable[List[str]]) -> None:
-    with open(out_csv, "a", newline="", encoding="utf-8") as handle:
-        writer = csv.writer(handle)
-        writer.writerows(rows)
+def open_csv_for_append(out_csv: str) -> TextIO:
+    # One large binary buffer for the whole run: each feed's rows are encoded into it and
+    # reach the file in a single write when append_rows flushes.
+    raw = open(out_csv, "ab", buffering=CSV_BUFFER_SIZE)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=False)
+
+
+def append_rows(handle: TextIO, rows: Iterable[List[str]]) -> None:
+    csv.writer(handle).writerows(rows)
+    handle.flush()
+
+
+def fetch_feed_page(
+    feed: FeedConfig, session: requests.Session
+) -> Optional[Tuple[HtmlElement, str, str]]:
+    """
+    Fetch the ticker news page, falling back to the generic topic page.
+    Returns (tree, source_label, base_url), or None if neither page is available.
+    """
+    primary_url = BASE_URL.format(ticker=feed.ticker)
+
+    tree = fetch_document(primary_url, session)
+    if tree is not None:
+        return tree, "primary", primary_url
+
+    logging.warning("Primary URL unavailable for %s; using fallback", feed.ticker)
+    tree = fetch_document(FALLBACK_URL, session)
+    if tree is not None:
+        return tree, "fallback", FALLBACK_URL
+
+    logging.error("Fallback URL unavailable for %s; skipping feed", feed.ticker)
+    return None
 
 
 def ingest_feed(
     feed: FeedConfig,
-    out_csv: str,
-    db_path: str,
+    page_future: "Future[Optional[Tuple[HtmlElement, str, str]]]",
+    csv_handle: TextIO,
+    conn: sqlite3.Connection,
+    seen_ids: set,
     max_items: int,
     session: requests.Session,
+    executor: ThreadPoolExecutor,
     fetched_at: str,
 ) -> int:
-    primary_url = BASE_URL.format(ticker=feed.ticker)
-
-    html = fetch_url(primary_url, session)
-    source_label = "primary"
-    base_for_parse = primary_url
-
-    if html is None:
-        logging.warning("Primary URL unavailable for %s; using fallback", feed.ticker)
-        html = fetch_url(FALLBACK_URL, session)
-        source_label = "fallback"
-        base_for_parse = FALLBACK_URL
+    page = page_future.result()
+    if page is None:
+        return 0
+    tree, source_label, base_for_parse = page
 
-        if html is None:
-            logging.error("Fallback URL unavailable for %s; skipping feed", feed.ticker)
-            return 0
-
-    items = parse_news_items(html, base_for_parse)
+    items = parse_news_items(tree, base_for_parse)
 
     # If we are parsing the generic topic page, filter down to the company query/ticker
     if source_label == "fallback":
-        items = [item for item in items if matches_query(item, feed)]
+        ticker_lower = feed.ticker.lower()
+        phrases = tuple(extract_query_terms(feed.query))
+        items = [item for item in items if matches_query(item, ticker_lower, phrases)]
 
     if len(items) == 0:
         logging.warning("No items parsed for %s (%s)", feed.ticker, source_label)
@@ -332,47 +447,45 @@ def ingest_feed(
     items = items[:max_items]
     logging.info("Parsed %d items for %s (%s)", len(items), feed.ticker, source_label)
 
-    ensure_db(db_path)
-    ensure_csv(out_csv)
-
     new_rows: List[List[str]] = []
     new_count = 0
     skipped = 0
 
-    with sqlite3.connect(db_path) as conn:
-        for item in items:
-            # item.link is already absolute+normalized from parse_news_items, but re-normalize to be safe.
-            normalized_link = normalize_link(item.link, primary_url)
-            feed_id = compute_id(normalized_link)
-
-            existing = conn.execute(
-                "SELECT 1 FROM seen_feed_ids WHERE id = ?", (feed_id,)
-            ).fetchone()
-            if existing:
-                skipped += 1
-                continue
-
-            item = enrich_summary(item, session)
-            insert_seen_id(conn, feed_id, fetched_at)
-
-            new_rows.append(
-                [
-                    feed_id,
-                    item.title,
-                    normalized_link,
-                    item.published,
-                    item.source,
-                    item.summary,
-                    feed.query,
-                    fetched_at,
-                ]
-            )
-            new_count += 1
+    # item.link is already absolute+normalized by parse_news_items.
+    feed_ids = [compute_id(item.link) for item in items]
 
-        conn.commit()
+    pending: List[Tuple[str, NewsItem]] = []
+    for feed_id, item in zip(feed_ids, items):
+        if feed_id in seen_ids:
+            skipped += 1
+            continue
+        seen_ids.add(feed_id)
+        pending.append((feed_id, item))
+
+    # Article fetches for missing summaries are independent; run them concurrently.
+    enriched = executor.map(lambda entry: enrich_summary(entry[1], session), pending)
+    seen_inserts: List[Tuple[str, str]] = []
+    for (feed_id, _), item in zip(pending, enriched):
+        seen_inserts.append((feed_id, fetched_at))
+        new_rows.append(
+            [
+                feed_id,
+                item.title,
+                item.link,
+                item.published,
+                item.source,
+                item.summary,
+                feed.query,
+                fetched_at,
+            ]
+        )
+        new_count += 1
 
+    # Rows must be on disk before their ids are marked seen, or a crash would drop them.
     if new_rows:
-        append_rows(out_csv, new_rows)
+        append_rows(csv_handle, new_rows)
+
+    insert_seen_ids(conn, seen_inserts)
 
     logging.info("Feed %s complete: %d new, %d skipped", feed.ticker, new_count, skipped)
     return new_count
@@ -423,26 +536,52 @@ def main() -> int:
             return 2
 
     fetched_at = datetime.now(timezone.utc).isoformat()
-    session = requests.Session()
+    session = build_session()
+    conn = open_db(args.db_path)
+    ensure_csv(args.out_csv)
 
     total_new = 0
-    for feed in feeds:
-        try:
-            total_new += ingest_feed(
-                feed,
-                out_csv=args.out_csv,
-                db_path=args.db_path,
-                max_items=args.max_items,
-                session=session,
-                fetched_at=fetched_at,
-            )
-        except requests.RequestException as exc:
-            # Network-ish errors only; 404/4xx are handled inside fetch_url and should not land here.
-            logging.error("Network error for %s: %s", feed.ticker, exc)
-            return 1
-        except Exception as exc:  # noqa: BLE001
-            logging.exception("Unexpected error for %s: %s", feed.ticker, exc)
-            return 1
+    # News pages are fetched concurrently up front; parsing, dedupe and writes stay on the
+    # main thread and run feed by feed in config order. Yahoo Finance pages have no
+    # published per-client rate limit, unlike the GDELT API, which is fetched one paced
+    # request at a time.
+    feed_workers = max(1, min(MAX_FEED_WORKERS, len(feeds)))
+    with (
+        closing(conn),
+        session,
+        ThreadPoolExecutor(max_workers=feed_workers) as feed_executor,
+        ThreadPoolExecutor(max_workers=MAX_ENRICH_WORKERS) as enrich_executor,
+        open_csv_for_append(args.out_csv) as csv_handle,
+    ):
+        ensure_db(conn)
+        migrate_seen_ids(conn, args.out_csv)
+        # One read of the store per run; later feeds dedupe against this set in memory.
+        seen_ids = load_seen_ids(conn)
+        futures = [
+            feed_executor.submit(fetch_feed_page, feed, session) for feed in feeds
+        ]
+        for feed, page_future in zip(feeds, futures):
+            try:
+                total_new += ingest_feed(
+                    feed,
+                    page_future,
+                    csv_handle=csv_handle,
+                    conn=conn,
+                    seen_ids=seen_ids,
+                    max_items=args.max_items,
+                    session=session,
+                    executor=enrich_executor,
+                    fetched_at=fetched_at,
+                )
+            except requests.RequestException as exc:
+                # Network-ish errors only; 404/4xx are handled inside fetch_document and should not land here.
+                logging.error("Network error for %s: %s", feed.ticker, exc)
+                feed_executor.shutdown(wait=False, cancel_futures=True)
+                return 1
+            except Exception as exc:  # noqa: BLE001
+                logging.exception("Unexpected error for %s: %s", feed.ticker, exc)
+                feed_executor.shutdown(wait=False, cancel_futures=True)
+                return 1
 
     logging.info("Ingestion complete. Total new items: %d", total_new)
     return 0